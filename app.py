@@ -13,18 +13,47 @@ Permite:
 """
 
 from pathlib import Path
-import base64
-from datetime import datetime
-
-from dash import Dash, html, dcc, Input, Output
+import copy
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from dash import Dash, html, dcc, Input, Output, State, ctx, no_update
+from flask import abort, request, send_from_directory
+from flask_compress import Compress
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
+import plotly.io as pio
+
+try:
+    import oxipng  # pacote pyoxipng (opcional): recompressão sem perdas dos PNGs
+except ImportError:
+    oxipng = None
 
 # ----------------- CONFIGURAÇÕES ----------------- #
 
 # Local das figuras (mesmo diretório do app.py)
 IMG_DIR = Path(__file__).parent
 
+# Rota Flask que serve os PNGs (o navegador baixa e guarda em cache por URL)
+URL_IMAGENS = "/imagens"
+
+# PNGs já passados pelo oxipng (nome -> mtime); fica fora de IMG_DIR
+OXIPNG_MANIFESTO = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "previsao_divino" / "oxipng.json"
+)
+
+# Intervalo (s) entre verificações de arquivos novos/regravados na pasta
+INTERVALO_VERIFICACAO = 60
+
 # Pontos de foco (coordenadas normalizadas 0–1 na imagem)
 PONTOS_FOCO = {
     # Exemplo de uso:
@@ -32,6 +61,10 @@ PONTOS_FOCO = {
     # "Trabalho": {"x": 0.72, "y": 0.35},
 }
 
+# Dash serializa as respostas dos callbacks pelo plotly.io.json:
+# usa o orjson explicitamente (falha na partida se não estiver instalado)
+pio.json.config.default_engine = "orjson"
+
 # ----------------- VARIÁVEIS DISPONÍVEIS ----------------- #
 
 VAR_OPCOES = {
@@ -47,8 +80,38 @@ VAR_OPCOES = {
     },
 }
 
+# Sufixo de data dos arquivos diários (YYYY-MM-DD)
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
 # ----------------- FUNÇÕES AUXILIARES ----------------- #
 
+def listar_nomes_png(prefix: str) -> list[str]:
+    """
+    Nomes dos arquivos '{prefix}*.png' da pasta de imagens.
+    Usa os.scandir e só operações de string (sem criar Path nem fazer stat por arquivo).
+    """
+    with os.scandir(IMG_DIR) as it:
+        return [
+            entry.name
+            for entry in it
+            if entry.name.startswith(prefix) and entry.name.endswith(".png")
+        ]
+
+
+@lru_cache(maxsize=1)
+def _datas_na_pasta(mtime_ns: int) -> list[str]:
+    """Varre a pasta; o mtime da pasta é só a chave do cache."""
+    prefix = VAR_OPCOES["prec"]["prefix"]
+
+    datas = set()
+    for nome in listar_nomes_png(prefix):
+        parte_data = nome[len(prefix):-len(".png")]  # ex.: '2025-11-13'
+        if DATE_RE.fullmatch(parte_data):
+            datas.add(parte_data)
+
+    return sorted(datas)
+
+
 def listar_datas_disponiveis():
     """
     Procura arquivos:
@@ -58,242 +121,279 @@ def listar_datas_disponiveis():
     if not IMG_DIR.exists():
         raise FileNotFoundError(f"Pasta de imagens não encontrada: {IMG_DIR}")
 
-    datas = set()
-    for img_path in IMG_DIR.glob("divino_prec_*.png"):
-        stem = img_path.stem  # ex.: 'divino_prec_2025-11-13'
-        parte_data = stem.replace("divino_prec_", "", 1)
-        try:
-            datetime.strptime(parte_data, "%Y-%m-%d")
-            datas.add(parte_data)
-        except ValueError:
-            continue
-
-    return sorted(datas)
+    return _datas_na_pasta(IMG_DIR.stat().st_mtime_ns)
 
 
+@lru_cache(maxsize=None)
 def formatar_label_br(data_iso: str) -> str:
     """Converte '2025-11-13' -> '13/11/2025'."""
-    dt = datetime.strptime(data_iso, "%Y-%m-%d")
-    return dt.strftime("%d/%m/%Y")
+    return f"{data_iso[8:10]}/{data_iso[5:7]}/{data_iso[0:4]}"
+
 
+# Arquivo acumulado mais recente por prefixo (refeito só se a pasta mudar)
+_ACUM_LATEST: dict[str, Path | None] = {}
+_ACUM_DIR_MTIME: int | None = None
 
-def carregar_imagem_base64(var_key: str, data_iso: str | None = None) -> str:
+
+def acumulado_mais_recente(prefix: str) -> Path | None:
+    """
+    Retorna o arquivo '{prefix}*.png' mais recente (maior nome = período mais novo).
+    A varredura da pasta só é refeita quando o mtime da pasta muda.
     """
-    Lê o arquivo PNG correspondente à variável e data,
-    converte em base64 para embutir no Dash.
+    global _ACUM_DIR_MTIME
+
+    mtime_ns = IMG_DIR.stat().st_mtime_ns
+    if mtime_ns != _ACUM_DIR_MTIME:
+        _ACUM_LATEST.clear()
+        _ACUM_DIR_MTIME = mtime_ns
+
+    if prefix not in _ACUM_LATEST:
+        nome = max(listar_nomes_png(prefix), default=None)
+        _ACUM_LATEST[prefix] = IMG_DIR / nome if nome else None
+    return _ACUM_LATEST[prefix]
+
+
+def resolver_caminho_imagem(var_key: str, data_iso: str | None = None) -> Path | None:
+    """
+    Resolve o arquivo PNG correspondente à variável e data.
 
     Para 'prec_acum', ignora data_iso e pega o arquivo acumulado mais recente.
+    Retorna None se não houver arquivo.
     """
     info = VAR_OPCOES[var_key]
     prefix = info["prefix"]
 
     if var_key == "prec_acum":
-        candidates = sorted(IMG_DIR.glob(f"{prefix}*.png"))
-        if not candidates:
+        img_path = acumulado_mais_recente(prefix)
+        if img_path is None:
             print(f"⚠️ Nenhuma imagem de precipitação acumulada encontrada com padrão {prefix}*.png")
-            return ""
-        img_path = candidates[-1]
-    else:
-        if data_iso is None:
-            return ""
-        img_path = IMG_DIR / f"{prefix}{data_iso}.png"
+        return img_path
+
+    if data_iso is None:
+        return None
+    return IMG_DIR / f"{prefix}{data_iso}.png"
+
+
+# URLs já resolvidas: (var_key, data_iso) -> URL (montado junto com o cache de figuras)
+IMG_URLS: dict[tuple, str] = {}
+
+
+def url_imagem(var_key: str, data_iso: str | None = None) -> str:
+    """
+    Retorna a URL do PNG correspondente à variável e data,
+    servido pela rota estática do app (sem embutir base64 na figura).
+    """
+    chave = (var_key, data_iso)
+    url = IMG_URLS.get(chave)
+    if url is not None:
+        return url
+
+    img_path = resolver_caminho_imagem(var_key, data_iso)
+    if img_path is None:
+        return ""
 
-    if not img_path.exists():
+    try:
+        etag = etag_imagem(img_path)
+    except FileNotFoundError:  # inexistente, ou removido pelo pipeline agora mesmo
         print(f"⚠️ Arquivo não encontrado: {img_path}")
         return ""
 
+    # '?v=' muda junto com o conteúdo: o navegador pode guardar a URL para sempre
+    url = f"{URL_IMAGENS}/{img_path.name}?v={etag}"
+    IMG_URLS[chave] = url
+    return url
+
+
+def proporcao_png(img_path: Path) -> float:
+    """Altura/largura do PNG, lida do cabeçalho IHDR (sem decodificar a imagem)."""
     with open(img_path, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode("ascii")
+        cabecalho = f.read(24)
+
+    if len(cabecalho) < 24 or cabecalho[12:16] != b"IHDR":
+        return 1.0
+
+    largura, altura = struct.unpack(">II", cabecalho[16:24])
+    return altura / largura if largura else 1.0
+
+
+# ETag por conteúdo de cada PNG: nome -> (mtime_ns, hash)
+_ETAGS: dict[str, tuple[int, str]] = {}
+
 
-    return f"data:image/png;base64,{encoded}"
+def etag_imagem(img_path: Path) -> str:
+    """Hash do conteúdo do PNG (blake2b, 8 bytes), recalculado só se o mtime mudar."""
+    st = img_path.stat()
+    cached = _ETAGS.get(img_path.name)
+    if cached is not None and cached[0] == st.st_mtime_ns:
+        return cached[1]
 
+    # Leitura em blocos de 1 MiB (buffer reaproveitado, sem copiar o PNG inteiro).
+    # Sem mmap: um PNG truncado durante a regravação derrubaria o processo (SIGBUS);
+    # aqui vira só uma leitura curta, corrigida na próxima verificação do mtime
+    h = hashlib.blake2b(digest_size=8)
+    buf = bytearray(1 << 20)
+    view = memoryview(buf)
+    with open(img_path, "rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            h.update(view[:n])
+    etag = h.hexdigest()
 
-def adicionar_pontos_foco(fig: go.Figure) -> go.Figure:
-    """Adiciona marcadores dos pontos de foco."""
+    _ETAGS[img_path.name] = (st.st_mtime_ns, etag)
+    return etag
+
+
+def _otimizar_png(img_path: Path, mtime_otimizado: int | None) -> int | None:
+    """
+    Recomprime um PNG, a menos que ele não tenha mudado desde a última otimização.
+    Grava num temporário e troca com os.replace: quem estiver lendo (ou servindo)
+    o arquivo nunca vê um PNG pela metade. Retorna o mtime após a otimização,
+    ou None se o arquivo sumiu ou não pôde ser otimizado (tenta de novo na próxima).
+    """
+    try:
+        mtime = img_path.stat().st_mtime_ns
+        if mtime == mtime_otimizado:
+            return mtime
+        dados = img_path.read_bytes()
+        otimizado = oxipng.optimize_from_memory(dados, level=4)
+    except FileNotFoundError:  # removido pelo pipeline
+        return None
+    except oxipng.PngError as e:  # PNG truncado/inválido
+        print(f"⚠️ oxipng falhou em {img_path.name}: {e}")
+        return None
+
+    if len(otimizado) >= len(dados):
+        return mtime
+
+    tmp_name = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=IMG_DIR, prefix=".", suffix=".tmp", delete=False) as tmp:
+            tmp_name = tmp.name
+            tmp.write(otimizado)
+        shutil.copymode(img_path, tmp_name)
+        # O pipeline regravou o PNG enquanto o oxipng rodava: não troca pelo antigo
+        if img_path.stat().st_mtime_ns != mtime:
+            return None
+        os.replace(tmp_name, img_path)
+        tmp_name = None
+        return img_path.stat().st_mtime_ns
+    except FileNotFoundError:  # removido durante a otimização
+        return None
+    finally:
+        if tmp_name is not None:
+            os.unlink(tmp_name)
+
+
+def otimizar_pngs():
+    """
+    Passa os PNGs novos/alterados pelo oxipng (sem perdas), deixando
+    imagem, JSON e HTTP menores. Não faz nada se o pyoxipng não estiver instalado.
+    Roda só pelo `python app.py` (local, antes de versionar os PNGs).
+    Os PNGs já otimizados ficam anotados em OXIPNG_MANIFESTO (fora da pasta de
+    imagens: um marcador lá dentro mudaria o mtime da pasta e os caches).
+    """
+    if oxipng is None:
+        return
+
+    try:
+        manifesto = json.loads(OXIPNG_MANIFESTO.read_text())
+    except (FileNotFoundError, ValueError):
+        manifesto = {}
+
+    nomes = listar_nomes_png("divino_prec_")
+    with ThreadPoolExecutor() as ex:
+        mtimes = list(ex.map(
+            lambda nome: _otimizar_png(IMG_DIR / nome, manifesto.get(nome)), nomes
+        ))
+
+    novo = {nome: mtime for nome, mtime in zip(nomes, mtimes) if mtime is not None}
+    n_otimizados = sum(1 for nome, mtime in novo.items() if manifesto.get(nome) != mtime)
+    if n_otimizados:
+        print(f"PNGs otimizados com oxipng: {n_otimizados}")
+
+    if novo != manifesto:
+        OXIPNG_MANIFESTO.parent.mkdir(parents=True, exist_ok=True)
+        tmp = OXIPNG_MANIFESTO.with_name(f"{OXIPNG_MANIFESTO.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(novo))
+        os.replace(tmp, OXIPNG_MANIFESTO)
+
+
+def trace_pontos_foco() -> dict | None:
+    """Trace (dict, sem validação do plotly) com os marcadores dos pontos de foco."""
     if not PONTOS_FOCO:
-        return fig
+        return None
 
     xs = [info["x"] for info in PONTOS_FOCO.values()]
     ys = [info["y"] for info in PONTOS_FOCO.values()]
     labels = list(PONTOS_FOCO.keys())
 
-    fig.add_trace(
-        go.Scatter(
-            x=xs,
-            y=ys,
-            mode="markers+text",
-            text=labels,
-            textposition="top center",
-            marker=dict(
-                size=10,
-                symbol="circle-open-dot",
-                line=dict(width=2),
-            ),
-            hovertemplate="%{text}<extra></extra>",
-        )
+    return dict(
+        type="scatter",
+        x=xs,
+        y=ys,
+        mode="markers+text",
+        text=labels,
+        textposition="top center",
+        marker=dict(
+            size=10,
+            symbol="circle-open-dot",
+            line=dict(width=2),
+        ),
+        hovertemplate="%{text}<extra></extra>",
     )
-    return fig
 
 
-def construir_figura_estatica(src: str, titulo: str) -> go.Figure:
-    """Figura estática com a imagem base64 + pontos de foco."""
-    fig = go.Figure()
-    if not src:
-        fig.update_layout(
-            xaxis={"visible": False},
-            yaxis={"visible": False},
-            margin=dict(l=0, r=0, t=40, b=0),
-            paper_bgcolor="white",
-            plot_bgcolor="white",
-        )
-        return fig
-
-    fig.add_layout_image(
-        dict(
-            source=src,
-            xref="x",
-            yref="y",
-            x=0,
-            y=1,
-            sizex=1,
-            sizey=1,
-            sizing="stretch",
-            layer="below",
-        )
-    )
+_TRACE_FOCO = trace_pontos_foco()
 
-    fig.update_xaxes(visible=False, range=[0, 1])
-    fig.update_yaxes(visible=False, range=[0, 1], scaleanchor="x")
+# Esqueleto comum das figuras (dict puro: o Dash aceita sem passar pelo go.Figure)
+_STATIC_TEMPLATE = {
+    "data": [_TRACE_FOCO] if _TRACE_FOCO is not None else [],
+    "layout": {
+        "xaxis": {"visible": False, "range": [0, 1]},
+        "yaxis": {"visible": False, "range": [0, 1], "scaleanchor": "x"},
+        "margin": {"l": 0, "r": 0, "t": 40, "b": 0},
+        "dragmode": "pan",
+        "paper_bgcolor": "white",
+        "plot_bgcolor": "white",
+    },
+}
 
-    fig = adicionar_pontos_foco(fig)
+# Posição/escala da imagem de fundo (só 'source' muda entre figuras)
+_IMAGEM_BASE = {
+    "xref": "x",
+    "yref": "y",
+    "x": 0,
+    "y": 1,
+    "sizex": 1,
+    "sizey": 1,
+    "sizing": "stretch",
+    "layer": "below",
+}
 
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=40, b=0),
-        dragmode="pan",
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-    )
-    return fig
+# Figura vazia (entradas faltando)
+_EMPTY_FIG = {"data": [], "layout": {}}
 
 
-def construir_animacao(var_key: str, datas_iso: list[str]) -> go.Figure:
-    """Figura animada: um frame por data da previsão."""
-    if len(datas_iso) == 0:
-        return construir_figura_estatica("", "Sem dados para animar")
-
-    src0 = carregar_imagem_base64(var_key, datas_iso[0])
-    fig = go.Figure()
-
-    if src0:
-        fig.add_layout_image(
-            dict(
-                source=src0,
-                xref="x",
-                yref="y",
-                x=0,
-                y=1,
-                sizex=1,
-                sizey=1,
-                sizing="stretch",
-                layer="below",
-            )
-        )
-
-    fig.update_xaxes(visible=False, range=[0, 1])
-    fig.update_yaxes(visible=False, range=[0, 1], scaleanchor="x")
-
-    frames = []
-    for d in datas_iso:
-        src = carregar_imagem_base64(var_key, d)
-        frames.append(
-            go.Frame(
-                name=d,
-                layout=dict(
-                    images=[
-                        dict(
-                            source=src,
-                            xref="x",
-                            yref="y",
-                            x=0,
-                            y=1,
-                            sizex=1,
-                            sizey=1,
-                            sizing="stretch",
-                            layer="below",
-                        )
-                    ],
-                ),
-            )
-        )
-
-    fig.frames = frames
-
-    slider_steps = [
-        dict(
-            method="animate",
-            args=[
-                [f.name],
-                {
-                    "mode": "immediate",
-                    "frame": {"duration": 500, "redraw": True},
-                    "transition": {"duration": 0},
-                },
-            ],
-            label=formatar_label_br(f.name),
-        )
-        for f in frames
-    ]
+def construir_figura_estatica(src: str, aspecto: float = 1.0) -> dict:
+    """
+    Figura estática com a imagem (URL) + pontos de foco, a partir do esqueleto.
+    'aspecto' (altura/largura do PNG) define a faixa do eixo y, para a imagem
+    não ser esticada num quadrado. Sem título: a data já aparece nos controles,
+    e os quadros da animação (que só trocam a imagem) não ficam com data velha.
+    """
+    fig = copy.deepcopy(_STATIC_TEMPLATE)
+    if not src:
+        fig["data"] = []
+        return fig
 
-    sliders = [
-        dict(
-            active=0,
-            steps=slider_steps,
-            x=0.1,
-            y=0,
-            len=0.9,
-            pad={"t": 30, "b": 10},
-            currentvalue={"prefix": "Data: "},
-            transition={"duration": 0},
-        )
+    fig["layout"]["yaxis"]["range"] = [0, aspecto]
+    for trace in fig["data"]:  # pontos de foco: y normalizado 0–1 na imagem
+        trace["y"] = [y * aspecto for y in trace["y"]]
+    fig["layout"]["images"] = [
+        {"source": src, **_IMAGEM_BASE, "y": aspecto, "sizey": aspecto}
     ]
-
-    updatemenus = [
-        dict(
-            type="buttons",
-            showactive=False,
-            x=0.0,
-            y=1.05,
-            xanchor="left",
-            yanchor="top",
-            buttons=[
-                dict(
-                    label="▶ Play",
-                    method="animate",
-                    args=[
-                        None,
-                        {
-                            "frame": {"duration": 500, "redraw": True},
-                            "fromcurrent": True,
-                            "transition": {"duration": 0},
-                        },
-                    ],
-                )
-            ],
-        )
-    ]
-
-    fig = adicionar_pontos_foco(fig)
-
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=40, b=40),
-        dragmode="pan",
-        sliders=sliders,
-        updatemenus=updatemenus,
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-    )
     return fig
 
+
 # ----------------- DATAS ----------------- #
 
 DATAS = listar_datas_disponiveis()
@@ -305,11 +405,174 @@ if not DATAS:
 
 DATA_DEFAULT = DATAS[-1]
 
+# ----------------- CACHE DE FIGURAS ----------------- #
+
+def chave_figura(var_key: str, data_iso: str | None) -> tuple:
+    """Normaliza a chave do cache: o acumulado ignora a data."""
+    if var_key == "prec_acum":
+        return (var_key, None)
+    return (var_key, data_iso)
+
+
+def construir_figura(var_key: str, data_iso: str | None) -> dict:
+    """Monta a figura (já como dict) para a combinação de entradas."""
+    src = url_imagem(var_key, data_iso)
+    aspecto = 1.0
+    if src:
+        try:
+            aspecto = proporcao_png(resolver_caminho_imagem(var_key, data_iso))
+        except FileNotFoundError:  # removido entre a URL e a leitura do cabeçalho
+            src = ""
+
+    fig = construir_figura_estatica(src, aspecto)
+    # Mantém pan/zoom do usuário ao trocar de data (só reinicia ao trocar a variável)
+    fig["layout"]["uirevision"] = var_key
+    return fig
+
+
+def construir_cache_figuras(datas_iso: list[str]) -> dict[tuple, dict]:
+    """Pré-calcula todas as figuras (variável × data), refazendo também as URLs."""
+    IMG_URLS.clear()
+
+    cache = {}
+    for var_key in VAR_OPCOES:
+        for data_iso in datas_iso:
+            chave = chave_figura(var_key, data_iso)
+            if chave not in cache:
+                cache[chave] = construir_figura(*chave)
+    return cache
+
+
+def assinatura_pasta() -> int:
+    """
+    Maior mtime entre a pasta e os PNGs: muda quando um arquivo é criado,
+    removido ou regravado no lugar (as URLs levam o hash do conteúdo).
+    """
+    mtimes = [IMG_DIR.stat().st_mtime_ns]
+    with os.scandir(IMG_DIR) as it:
+        for entry in it:
+            if not (entry.name.startswith("divino_prec_") and entry.name.endswith(".png")):
+                continue
+            try:
+                mtimes.append(entry.stat().st_mtime_ns)
+            except FileNotFoundError:  # removido entre o scandir e o stat
+                pass
+    return max(mtimes)
+
+
+_CACHE_LOCK = threading.Lock()
+_ASSINATURA: int | None = None  # None = cache ainda não montado
+_ULTIMA_VERIFICACAO = 0.0
+FIG_CACHE: dict[tuple, dict] = {}
+
+
+def aquecer_caches():
+    """
+    Pré-calcula as ETags dos PNGs e as figuras.
+    Roda numa thread de fundo na partida, para o layout responder na hora.
+    """
+    global FIG_CACHE, _ASSINATURA
+
+    # Hash de todos os PNGs em paralelo (leitura e hashlib liberam o GIL);
+    # as figuras, montadas em seguida, já encontram as ETags prontas
+    def etag_se_existir(img_path: Path):
+        try:
+            etag_imagem(img_path)
+        except FileNotFoundError:  # removido depois da listagem
+            pass
+
+    paths = [IMG_DIR / nome for nome in listar_nomes_png("divino_prec_")]
+    with ThreadPoolExecutor() as ex:
+        list(ex.map(etag_se_existir, paths))
+
+    with _CACHE_LOCK:
+        assinatura = assinatura_pasta()
+        # Um callback pode ter montado o cache enquanto as ETags eram calculadas
+        if assinatura != _ASSINATURA:
+            FIG_CACHE = construir_cache_figuras(DATAS)
+            _ASSINATURA = assinatura
+
+
+threading.Thread(target=aquecer_caches, daemon=True).start()
+
+
+def obter_figura(var_key: str, data_iso: str | None) -> dict:
+    """
+    Retorna a figura pré-calculada.
+    Se a pasta de imagens mudou (arquivos novos/removidos/regravados), refaz o cache;
+    a verificação roda no máximo a cada INTERVALO_VERIFICACAO segundos.
+    """
+    global DATAS, FIG_CACHE, _ASSINATURA, _ULTIMA_VERIFICACAO
+
+    agora = time.monotonic()
+    if _ASSINATURA is None or agora - _ULTIMA_VERIFICACAO >= INTERVALO_VERIFICACAO:
+        _ULTIMA_VERIFICACAO = agora
+        assinatura = assinatura_pasta()
+        if assinatura != _ASSINATURA:
+            with _CACHE_LOCK:
+                if assinatura != _ASSINATURA:
+                    DATAS = listar_datas_disponiveis() or DATAS
+                    FIG_CACHE = construir_cache_figuras(DATAS)
+                    _ASSINATURA = assinatura
+
+    chave = chave_figura(var_key, data_iso)
+    fig = FIG_CACHE.get(chave)
+    if fig is None:
+        # Data fora da lista atual: monta sob demanda
+        fig = construir_figura(*chave)
+    return fig
+
 # ----------------- APP DASH ----------------- #
 
-app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+app = Dash(
+    __name__,
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    update_title=None,  # não reescreve o título da aba a cada callback
+)
 server = app.server  # usado pelo gunicorn
 
+# Compressão das respostas (JSON dos callbacks, HTML, JS/CSS do Dash).
+# PNG já é comprimido: não vale a pena recomprimir.
+server.config.update(
+    COMPRESS_MIMETYPES=[
+        "application/json",
+        "text/html",
+        "text/css",
+        "application/javascript",
+        "text/javascript",
+    ],
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    # Nível moderado: o JSON dos callbacks já fica 5–10× menor sem pesar na CPU
+    COMPRESS_LEVEL=4,
+    COMPRESS_BR_LEVEL=4,
+)
+Compress(server)
+
+
+@server.route(f"{URL_IMAGENS}/<filename>")
+def static_files(filename):
+    """
+    Serve os PNGs da pasta do app (apenas o padrão divino_prec_*.png),
+    com ETag pelo conteúdo: o navegador revalida e recebe 304 sem corpo.
+    URLs versionadas ('?v=<etag>') são imutáveis e ficam em cache por 1 ano.
+    """
+    if not (filename.startswith("divino_prec_") and filename.endswith(".png")):
+        abort(404)
+
+    img_path = IMG_DIR / filename
+    try:
+        etag = etag_imagem(img_path)
+    except (FileNotFoundError, IsADirectoryError):
+        abort(404)
+
+    response = send_from_directory(IMG_DIR, filename, etag=etag)
+    if request.args.get("v") == etag:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "public, max-age=86400"
+    return response
+
+
 app.title = "Previsão de Chuva - Divino"
 
 app.layout = dbc.Container(
@@ -378,6 +641,39 @@ app.layout = dbc.Container(
                 ),
                 dbc.Col(
                     [
+                        html.Div(
+                            [
+                                dbc.Button(
+                                    "▶ Play",
+                                    id="btn-play",
+                                    size="sm",
+                                    color="secondary",
+                                    className="me-3",
+                                ),
+                                html.Span(
+                                    f"Data: {formatar_label_br(DATAS[0])}",
+                                    id="label-anim",
+                                    className="fw-bold",
+                                ),
+                                dcc.Slider(
+                                    id="slider-anim",
+                                    min=0,
+                                    max=len(DATAS) - 1,
+                                    step=1,
+                                    value=0,
+                                    marks=None,
+                                    className="mt-2",
+                                ),
+                                dcc.Interval(
+                                    id="intervalo-anim",
+                                    interval=500,
+                                    disabled=True,
+                                ),
+                                dcc.Store(id="store-anim"),
+                            ],
+                            id="controles-anim",
+                            style={"display": "none"},
+                        ),
                         dcc.Graph(
                             id="graph-mapa",
                             style={"height": "85vh"},
@@ -412,39 +708,105 @@ app.layout = dbc.Container(
     Input("dropdown-data", "value"),
     Input("radio-var", "value"),
     Input("radio-modo", "value"),
+    State("slider-anim", "value"),
 )
-def atualizar_mapa(data_iso, var_key, modo):
+def atualizar_mapa(data_iso, var_key, modo, idx_anim):
     if var_key is None:
-        return go.Figure()
+        return _EMPTY_FIG
 
-    info = VAR_OPCOES[var_key]
+    # Acumulado ignora data e modo: se só eles mudaram, a figura é a mesma
+    if var_key == "prec_acum" and ctx.triggered_id in ("dropdown-data", "radio-modo"):
+        return no_update
 
-    # Acumulado: sempre estático
-    if var_key == "prec_acum":
-        src = carregar_imagem_base64("prec_acum", None)
-        return construir_figura_estatica(src, info["label"])
-
-    # Diário
-    if modo == "dia":
-        if data_iso is None:
-            return go.Figure()
-        label_data = formatar_label_br(data_iso)
-        titulo = f"{info['label']} – {label_data}"
-        src = carregar_imagem_base64(var_key, data_iso)
-        return construir_figura_estatica(src, titulo)
-    else:
-        return construir_animacao(var_key, DATAS)
+    # Animação: parte do dia atual do slider (os frames trocam só a URL)
+    if var_key != "prec_acum" and modo == "anim":
+        data_iso = DATAS[min(idx_anim or 0, len(DATAS) - 1)]
 
-# ----------------- MAIN (apenas local) ----------------- #
+    if var_key != "prec_acum" and data_iso is None:
+        return _EMPTY_FIG
+
+    return obter_figura(var_key, data_iso)
 
-if __name__ == "__main__":
-    print("Painel Divino rodando em http://127.0.0.1:8050/")
-    app.run(host="0.0.0.0", port=8050, debug=True)
 
+@app.callback(
+    Output("controles-anim", "style"),
+    Output("intervalo-anim", "disabled"),
+    Output("btn-play", "children"),
+    Output("store-anim", "data"),
+    Output("slider-anim", "max"),
+    Input("radio-var", "value"),
+    Input("radio-modo", "value"),
+    Input("btn-play", "n_clicks"),
+    State("intervalo-anim", "disabled"),
+)
+def controlar_animacao(var_key, modo, _n_clicks, parado):
+    """
+    Mostra os controles só na animação do campo diário; Play/Pause liga o intervalo.
+    Ao entrar na animação, envia a lista de URLs/rótulos usada no navegador.
+    """
+    if var_key == "prec_acum" or modo != "anim":
+        return {"display": "none"}, True, "▶ Play", no_update, no_update
 
+    if ctx.triggered_id == "btn-play":
+        parado = not parado
+        return {}, parado, "▶ Play" if parado else "⏸ Pause", no_update, no_update
 
-if __name__ == "__main__":
-    # rodar local
-    app.run(host="0.0.0.0", port=8050, debug=True)
+    anim = {
+        "urls": [url_imagem(var_key, d) for d in DATAS],
+        "labels": [formatar_label_br(d) for d in DATAS],
+    }
+    return {}, True, "▶ Play", anim, len(DATAS) - 1
 
 
+# Animação no navegador: o intervalo avança o slider e o slider troca só a URL
+# da imagem (Patch), sem ida ao servidor a cada passo; os quadros vizinhos
+# são pré-carregados para o Play não esperar pela rede.
+app.clientside_callback(
+    """
+    function(nIntervals, idx, idxMax) {
+        return ((idx || 0) + 1) % (idxMax + 1);
+    }
+    """,
+    Output("slider-anim", "value"),
+    Input("intervalo-anim", "n_intervals"),
+    State("slider-anim", "value"),
+    State("slider-anim", "max"),
+    prevent_initial_call=True,
+)
+
+app.clientside_callback(
+    """
+    function(idx, anim, varKey, modo) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (varKey === "prec_acum" || modo !== "anim" || idx == null || !anim) {
+            return [noUpdate, noUpdate];
+        }
+        const n = anim.urls.length;
+        const i = Math.min(idx, n - 1);
+        // Pré-carrega os quadros vizinhos no cache HTTP do navegador
+        [i + 1, i - 1 + n].forEach(function(j) {
+            new Image().src = anim.urls[j % n];
+        });
+        const patch = new window.dash_clientside.Patch();
+        patch.assign(["layout", "images", 0, "source"], anim.urls[i]);
+        return [patch.build(), "Data: " + anim.labels[i]];
+    }
+    """,
+    Output("graph-mapa", "figure", allow_duplicate=True),
+    Output("label-anim", "children"),
+    Input("slider-anim", "value"),
+    State("store-anim", "data"),
+    State("radio-var", "value"),
+    State("radio-modo", "value"),
+    prevent_initial_call=True,
+)
+
+# ----------------- MAIN (apenas local) ----------------- #
+
+if __name__ == "__main__":
+    # Otimização dos PNGs: uma vez só, aqui (nunca nos workers do gunicorn).
+    # Com debug=True o reloader reexecuta este bloco no processo filho; pula lá.
+    if os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        otimizar_pngs()
+    print("Painel Divino rodando em http://127.0.0.1:8050/")
+    app.run(host="0.0.0.0", port=8050, debug=True)